@@ -11,13 +11,19 @@ bl_info = {
 }
 
 import bpy
+import hashlib
+import io
 import os
 import numpy as np
 from mathutils import Matrix
 import math
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 # Conversion matrix from Blender (Z-up) to Three.js (Y-up)
 BLENDER_TO_THREE = Matrix.Rotation(-math.pi/2, 4, 'X')
+# Transposed float32 copy, right-multiplied onto column-major bone matrices
+_BLENDER_TO_THREE_T = np.array(BLENDER_TO_THREE, dtype=np.float32).T
 
 # --------------------------------------------------------------------
 # Property groups
@@ -94,6 +100,16 @@ class AnimationExportProperties(bpy.types.PropertyGroup):
         default=False,
         description="Ignore frame steps and export every frame for all animations"
     )
+    export_precision: bpy.props.EnumProperty(
+        name="Precision",
+        items=[
+            ('FP32', "Float32", "Full precision matrices"),
+            ('FP16', "Float16", "Half precision matrices, half the size"),
+            ('INT16', "Int16", "Fixed-point matrices with one scale per matrix element, half the size"),
+        ],
+        default='FP32',
+        description="Numeric format of the exported matrix data"
+    )
     # transition_frames is fixed at 10
 
 
@@ -124,11 +140,45 @@ class AnimationListItem(bpy.types.PropertyGroup):
         min=0,
         description="Custom end frame for this animation (0 for action end)"
     )
+    action_end: bpy.props.IntProperty(
+        name="Action End",
+        default=0,
+        options={'HIDDEN'},
+        description="Action end frame at the last refresh, to tell whether custom_end was edited"
+    )
 
 # --------------------------------------------------------------------
 # UI Lists & Operators
 # --------------------------------------------------------------------
+# operator idnames, shared by the classes and the panel buttons
+_OP_REFRESH_LIST = "animation_list.refresh"
+_OP_EDIT_SETTINGS = "animation_list.edit_settings"
+_OP_SHOW_MESSAGE = "export_animation.show_message"
+_OP_EXPORT = "export_animation.export"
+
+# scene pointer -> (key, flt_flags, flt_neworder) from the last filter_items() call
+_filter_cache = {}
+
+
 class AnimationList(bpy.types.UIList):
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        # invert and reverse sorting are applied by Blender on top of these results
+        key = (self.filter_name, self.use_filter_sort_alpha, len(items), data.animation_list_signature)
+        cached = _filter_cache.get(data.as_pointer())
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        helper = bpy.types.UI_UL_list
+        flt_flags = []
+        flt_neworder = []
+        if self.filter_name:
+            flt_flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+        if self.use_filter_sort_alpha:
+            flt_neworder = helper.sort_items_by_name(items, "name")
+        _filter_cache[data.as_pointer()] = (key, flt_flags, flt_neworder)
+        return flt_flags, flt_neworder
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row(align=True)
@@ -143,26 +193,83 @@ class AnimationList(bpy.types.UIList):
             layout.label(text=item.name)
 
 
+def _action_list_signature(names, frame_ranges):
+    """Stable digest of the action names and frame ranges shown in the list."""
+    digest = hashlib.sha1("\0".join(names).encode("utf-8"))
+    digest.update(frame_ranges.tobytes())
+    return digest.hexdigest()
+
+
 class AnimationList_OT_Refresh(bpy.types.Operator):
-    bl_idname = "animation_list.refresh"
+    bl_idname = _OP_REFRESH_LIST
     bl_label = "Refresh Animation List"
 
     def execute(self, context):
         scene = context.scene
-        scene.animation_list.clear()
-        for action in bpy.data.actions:
-            item = scene.animation_list.add()
-            item.name = action.name
-            item.action = action
-            item.frame_step = 1
-            item.use_full_range = True
-            item.custom_start = 1
-            item.custom_end = int(action.frame_range[1])
+        items = scene.animation_list
+        actions = bpy.data.actions
+        n = len(actions)
+
+        names = [action.name for action in actions]
+        frame_ranges = np.empty(n * 2, dtype=np.float32)
+        actions.foreach_get("frame_range", frame_ranges)
+
+        signature = _action_list_signature(names, frame_ranges)
+        if signature == scene.animation_list_signature:
+            return {'CANCELLED'}
+
+        # items follow their action, not its name: drop items whose action is
+        # gone (or that repeat one), keep the rest with their settings
+        order = {action.as_pointer(): i for i, action in enumerate(actions)}
+        seen = set()
+        for i in range(len(items) - 1, -1, -1):
+            action = items[i].action
+            key = action.as_pointer() if action is not None else None
+            if key not in order or key in seen:
+                items.remove(i)
+            else:
+                seen.add(key)
+
+        # renamed actions keep their item; only the label is resynced
+        for item in items:
+            if item.name != item.action.name:
+                item.name = item.action.name
+        for key, action in zip(order, actions):
+            if key not in seen:
+                item = items.add()
+                item.name = action.name
+                item.action = action
+
+        # new items were appended – move them into bpy.data.actions order
+        current = [order[item.action.as_pointer()] for item in items]
+        for i in range(n):
+            if current[i] != i:
+                j = current.index(i, i)
+                items.move(j, i)
+                current.insert(i, current.pop(j))
+
+        # custom_end follows the action's end unless the user edited it; new
+        # items start with both at 0, so they pick up the end as well
+        n_items = len(items)
+        custom_ends = np.empty(n_items, dtype=np.int32)
+        action_ends = np.empty(n_items, dtype=np.int32)
+        items.foreach_get("custom_end", custom_ends)
+        items.foreach_get("action_end", action_ends)
+        # IntProperty min=0 is not enforced by foreach_set
+        ends = np.maximum(frame_ranges[1::2].astype(np.int32), 0)
+        untouched = custom_ends[:n] == action_ends[:n]
+        custom_ends[:n][untouched] = ends[untouched]
+        action_ends[:n] = ends
+        items.foreach_set("custom_end", custom_ends)
+        items.foreach_set("action_end", action_ends)
+
+        scene.animation_list_index = min(scene.animation_list_index, n - 1)
+        scene.animation_list_signature = signature
         return {'FINISHED'}
 
 
 class AnimationList_OT_EditSettings(bpy.types.Operator):
-    bl_idname = "animation_list.edit_settings"
+    bl_idname = _OP_EDIT_SETTINGS
     bl_label = "Edit Animation Settings"
     bl_options = {'REGISTER', 'UNDO'}
 
@@ -193,8 +300,453 @@ class AnimationList_OT_EditSettings(bpy.types.Operator):
 # --------------------------------------------------------------------
 # Core export functions
 # --------------------------------------------------------------------
+# One row per exported sequence (rest pose, animation or transition); the
+# names live in a parallel list so the table stays plain int32 columns.
+_SEQUENCE_DTYPE = np.dtype([
+    ('start_idx', np.int32),
+    ('end_idx', np.int32),
+    ('frame_count', np.int32),
+    ('frame_step', np.int32),
+    ('range_start', np.int32),
+    ('range_end', np.int32),
+])
+
+
+class _FrameScratch:
+    """Buffers reused by every baked frame, across animations and exports."""
+    __slots__ = ('bones', 'world', 'pre_t')
+
+    def __init__(self, num_bones):
+        # every bone's pose matrix, transposed (see _collect_frame)
+        self.bones = np.empty((num_bones, 4, 4), dtype=np.float32)
+        self.world = np.empty((4, 4), dtype=np.float32)
+        self.pre_t = np.empty((4, 4), dtype=np.float32)
+
+
+_frame_scratch_cache = None
+
+
+def _frame_scratch(num_bones):
+    """Return a ``_FrameScratch`` for ``num_bones``, reusing the last one when it fits."""
+    global _frame_scratch_cache
+    if _frame_scratch_cache is None or len(_frame_scratch_cache.bones) != num_bones:
+        _frame_scratch_cache = _FrameScratch(num_bones)
+    return _frame_scratch_cache
+
+
+def _frame_numbers(start_frame, end_frame, frame_step=1):
+    """Return the frames to bake as an int32 array, always ending on ``end_frame``."""
+    frames = np.arange(start_frame, end_frame + 1, frame_step, dtype=np.int32)
+    if frames[-1] != end_frame:
+        frames = np.append(frames, np.int32(end_frame))
+    return frames
+
+
+class _AnimSpec:
+    """One included animation list entry, resolved once for the whole export."""
+    # plain __slots__ class: dataclass(slots=True) needs Python 3.10, Blender 3.0 ships 3.9
+    __slots__ = ('action', 'name', 'start_frame', 'end_frame', 'frame_step', 'frames')
+
+    def __init__(self, item, export_all_frames):
+        action = item.action
+        if item.use_full_range:
+            start_frame = int(action.frame_range[0])
+            end_frame = int(action.frame_range[1])
+        else:
+            start_frame = item.custom_start
+            end_frame = item.custom_end if item.custom_end else int(action.frame_range[1])
+
+        if start_frame > end_frame:
+            raise Exception(f"Start frame cannot be after end frame for animation: {action.name}")
+
+        self.action = action
+        self.name = action.name
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.frame_step = 1 if export_all_frames else item.frame_step
+        self.frames = _frame_numbers(start_frame, end_frame, self.frame_step)
+
+
+@functools.cache
+def _transition_weights(transition_frames, frame_step=1):
+    """Frame numbers and ``[0, 1]`` blend weights shared by every transition.
+
+    Cached and returned read-only, since every pair and every export reuses them.
+    """
+    frames = _frame_numbers(1, transition_frames, frame_step)
+    weights = (frames.astype(np.float32) - 1) / (transition_frames - 1)
+    frames.flags.writeable = False
+    weights.flags.writeable = False
+    return frames, weights
+
+
+# |det| below which a baked matrix (e.g. a bone scaled to zero) is treated as
+# having no inverse
+_SINGULAR_DET = 1e-12
+
+# Rigs with at least this many bones use the Numba kernel when it is available
+NUMBA_MIN_BONES = 64
+
+# numba.prange once _numba_kernel() has imported Numba
+_prange = range
+
+
+def _bones_to_three_kernel(m_pre_t, bones_t, out):
+    # same maths as the GEMM in _pose_to_three, one bone per parallel lane
+    for b in _prange(bones_t.shape[0]):
+        for c in range(4):
+            for r in range(4):
+                s = 0.0
+                for k in range(4):
+                    s += bones_t[b, c, k] * m_pre_t[k, r]
+                out[b, c, r] = s
+
+
+@functools.cache
+def _numba_kernel():
+    """``_bones_to_three_kernel`` compiled with Numba, or ``None`` without Numba.
+
+    Numba is imported on the first call rather than at add-on load, since only
+    rigs with ``NUMBA_MIN_BONES`` or more bones use it.
+    """
+    global _prange
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    _prange = prange
+    return njit(cache=True, parallel=True, fastmath=True)(_bones_to_three_kernel)
+
+
+def _pose_to_three(arm, scratch, out):
+    """Transform the transposed pose matrices in ``scratch.bones`` to Three.js space.
+
+    ``scratch`` is a ``_FrameScratch``, ``out`` a contiguous
+    ``(num_bones, 4, 4)`` view into the destination slab. Each bone is written
+    column-major, matching the .bin format.
+    """
+    # (M_pre @ B).T == B.T @ M_pre.T, so transposed input gives transposed output
+    scratch.world[:] = arm.matrix_world
+    np.matmul(scratch.world.T, _BLENDER_TO_THREE_T, out=scratch.pre_t)
+    kernel = _numba_kernel() if len(scratch.bones) >= NUMBA_MIN_BONES else None
+    if kernel is not None:
+        kernel(scratch.pre_t, scratch.bones, out)
+        return
+    # Stacking the bones as (num_bones * 4, 4) rows turns the batch into a
+    # single 2-D GEMM instead of num_bones tiny 4x4 products.
+    np.matmul(scratch.bones.reshape(-1, 4), scratch.pre_t, out=out.reshape(-1, 4))
+
+
+def _collect_frame(arm, depsgraph, scratch, out):
+    """Write the Three.js space matrices of all pose bones at the current frame.
+
+    Matrices are read from the armature evaluated in ``depsgraph``, which
+    ``scene.frame_set`` has just updated.
+    """
+    arm_eval = arm.evaluated_get(depsgraph)
+    # foreach_get copies Blender's column-major storage, so bones[i] already
+    # holds bone.matrix transposed
+    arm_eval.pose.bones.foreach_get("matrix", scratch.bones.ravel())
+    _pose_to_three(arm_eval, scratch, out)
+
+
+def _bone_hierarchy(pose_bones):
+    """Parent index of each pose bone (-1 for roots) and a parents-first bone order."""
+    bone_index = {pb.name: i for i, pb in enumerate(pose_bones)}
+    parents = [bone_index[pb.parent.name] if pb.parent else -1 for pb in pose_bones]
+    depths = []
+    for p in parents:
+        depth = 0
+        while p >= 0:
+            depth += 1
+            p = parents[p]
+        depths.append(depth)
+    order = sorted(range(len(parents)), key=depths.__getitem__)
+    return parents, order
+
+
+def _action_fcurves(anim):
+    """F-Curves of the action slot ``anim`` plays, or ``None`` if they can't be resolved."""
+    action = anim.action
+    if not hasattr(action, "layers"):
+        return action.fcurves   # before slotted actions (Blender 4.4)
+    # the legacy Action.fcurves only reads the first slot, so go through the
+    # assigned slot's channelbag; multi-layer/strip actions aren't supported
+    slot = anim.action_slot
+    if slot is None or len(action.layers) != 1 or len(action.layers[0].strips) != 1:
+        return None
+    channelbag = action.layers[0].strips[0].channelbag(slot)
+    return channelbag.fcurves if channelbag is not None else None
+
+
+# Frames sampled per _FCurvePoseBaker.bake() call when streaming
+_FCURVE_BLOCK_FRAMES = 256
+
+
+class _FCurvePoseBaker:
+    """Builds pose frames straight from the active action's F-Curves.
+
+    Only for rigs whose pose is fully determined by that action: quaternion
+    bones with default inheritance, no constraints, drivers or NLA, the action
+    applied at full influence in Replace mode, the rig in Pose Position, no
+    object-level animation and no scene time remapping. ``create`` returns
+    ``None`` for anything else and the caller steps the depsgraph instead.
+    """
+    __slots__ = ('arm', 'channels', 'loc', 'rot', 'scale', 'parents', 'order', 'rel_t')
+
+    @classmethod
+    def create(cls, arm, scene):
+        # frame_set evaluates at frame * frame_map_new / frame_map_old
+        if scene.render.frame_map_old != scene.render.frame_map_new:
+            return None
+        anim = arm.animation_data
+        if (anim is None or anim.action is None or anim.use_tweak_mode or len(anim.drivers)
+                or any(not track.mute for track in anim.nla_tracks)):
+            return None
+        # partial influence or non-replace blending mixes the action with the current pose
+        if anim.action_influence != 1.0 or anim.action_blend_type != 'REPLACE':
+            return None
+        if arm.data.pose_position == 'REST':
+            return None   # Blender ignores the pose channels
+        if arm.parent is not None or len(arm.constraints):
+            return None
+        data_anim = arm.data.animation_data
+        if data_anim is not None and len(data_anim.drivers):
+            return None
+
+        pose_bones = arm.pose.bones
+        parents, order = _bone_hierarchy(pose_bones)
+        paths = {}
+        for i, pb in enumerate(pose_bones):
+            bone = pb.bone
+            if (pb.rotation_mode != 'QUATERNION' or len(pb.constraints)
+                    or bone.inherit_scale != 'FULL' or not bone.use_inherit_rotation
+                    or not bone.use_local_location or bone.use_relative_parent):
+                return None
+            for slot, prop in enumerate(('location', 'rotation_quaternion', 'scale')):
+                paths[pb.path_from_id(prop)] = (slot, i)
+
+        fcurves = _action_fcurves(anim)
+        if fcurves is None:
+            return None
+        channels = []
+        for fc in fcurves:
+            if fc.mute or (fc.group is not None and fc.group.mute):
+                continue   # Blender skips muted curves and curves in muted groups
+            target = paths.get(fc.data_path)
+            if target is None:
+                if fc.data_path.startswith("pose.bones["):
+                    continue   # custom property or a channel the pose matrix ignores
+                return None    # object-level animation
+            channels.append((fc, target[0], target[1], fc.array_index))
+
+        self = cls()
+        self.arm = arm
+        self.channels = channels
+        # unanimated channels keep their current values
+        num_bones = len(pose_bones)
+        self.loc = np.empty((num_bones, 3), dtype=np.float32)
+        self.rot = np.empty((num_bones, 4), dtype=np.float32)
+        self.scale = np.empty((num_bones, 3), dtype=np.float32)
+        pose_bones.foreach_get("location", self.loc.ravel())
+        pose_bones.foreach_get("rotation_quaternion", self.rot.ravel())
+        pose_bones.foreach_get("scale", self.scale.ravel())
+
+        # pose(b) = pose(parent) @ rest(parent)^-1 @ rest(b) @ basis(b)
+        rest = np.array([pb.bone.matrix_local for pb in pose_bones], dtype=np.float64).reshape(num_bones, 4, 4)
+        rel = rest.copy()
+        for b, p in enumerate(parents):
+            if p >= 0:
+                rel[b] = np.linalg.inv(rest[p]) @ rest[b]
+        self.parents = parents
+        self.order = order
+        self.rel_t = np.ascontiguousarray(rel.transpose(0, 2, 1), dtype=np.float32)
+        return self
+
+    def bake(self, frames, scratch, out):
+        """Write Three.js space matrices for ``frames`` into ``(len(frames), num_bones, 4, 4)`` ``out``."""
+        n = len(frames)
+        trs = [np.repeat(a[None], n, axis=0) for a in (self.loc, self.rot, self.scale)]
+        frame_list = frames.tolist()
+        for fc, slot, bone, index in self.channels:
+            trs[slot][:, bone, index] = np.fromiter(map(fc.evaluate, frame_list), dtype=np.float32, count=n)
+        loc, rot, scale = trs
+        norm = np.linalg.norm(rot, axis=-1, keepdims=True)
+        rot = np.where(norm > 0.0, rot / np.where(norm > 0.0, norm, 1.0), np.float32([1.0, 0.0, 0.0, 0.0]))
+
+        # everything below stays transposed, like foreach_get("matrix") output:
+        # pose_t(b) = basis_t(b) @ rel_t(b) @ pose_t(parent)
+        pose_t = np.empty(out.shape, dtype=np.float32)
+        _compose_frames(loc, rot, scale, pose_t)
+        for b in self.order:
+            p = self.parents[b]
+            local_t = pose_t[:, b] @ self.rel_t[b]
+            pose_t[:, b] = local_t @ pose_t[:, p] if p >= 0 else local_t
+
+        scratch.world[:] = self.arm.matrix_world
+        np.matmul(scratch.world.T, _BLENDER_TO_THREE_T, out=scratch.pre_t)
+        np.matmul(pose_t.reshape(-1, 4), scratch.pre_t, out=out.reshape(-1, 4))
+
+
+def _decompose_frame(frame):
+    """Split ``(n, 4, 4)`` baked bone matrices into translation, rotation and scale.
+
+    ``n`` is usually one frame's bones but may span several stacked frames.
+    Returns ``(n, 3)`` locations, ``(n, 4)`` ``(w, x, y, z)`` quaternions and
+    ``(n, 3)`` scales.
+    """
+    # baked frames are stored transposed, so frame[:, c, :3] is column c
+    cols = frame[:, :3, :3]
+    loc = frame[:, 3, :3].copy()
+    scale = np.linalg.norm(cols, axis=-1)
+    # negative determinant: flip the scale and the basis, as Matrix.decompose() does
+    flip = np.where(np.linalg.det(cols) < 0.0, -1.0, 1.0).astype(np.float32)
+    scale *= flip[:, None]
+    safe_scale = np.where(scale == 0.0, 1.0, scale)
+    # R[b, r, c] is the normalised rotation matrix of bone b
+    R = np.swapaxes(cols / safe_scale[:, :, None], -1, -2)
+
+    r00, r01, r02 = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+    r10, r11, r12 = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+    r20, r21, r22 = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+    # Shepperd's method: build the quaternion from its largest component
+    diag = np.stack((r00 + r11 + r22, r00, r11, r22), axis=-1)
+    largest = np.argmax(diag, axis=-1)
+    k = np.sqrt(np.maximum(1.0 + np.stack((
+        r00 + r11 + r22,
+        r00 - r11 - r22,
+        r11 - r00 - r22,
+        r22 - r00 - r11,
+    ), axis=-1), 1e-12)) * 0.5
+    inv = 0.25 / k
+    candidates = np.stack((
+        np.stack((k[:, 0], (r21 - r12) * inv[:, 0], (r02 - r20) * inv[:, 0], (r10 - r01) * inv[:, 0]), axis=-1),
+        np.stack(((r21 - r12) * inv[:, 1], k[:, 1], (r01 + r10) * inv[:, 1], (r02 + r20) * inv[:, 1]), axis=-1),
+        np.stack(((r02 - r20) * inv[:, 2], (r01 + r10) * inv[:, 2], k[:, 2], (r12 + r21) * inv[:, 2]), axis=-1),
+        np.stack(((r10 - r01) * inv[:, 3], (r02 + r20) * inv[:, 3], (r12 + r21) * inv[:, 3], k[:, 3]), axis=-1),
+    ), axis=1)
+    rot = candidates[np.arange(len(frame)), largest]
+    rot *= np.where(rot[:, :1] < 0.0, -1.0, 1.0)
+    rot /= np.linalg.norm(rot, axis=-1, keepdims=True)
+    return loc, rot.astype(np.float32, copy=False), scale
+
+
+def _lerp(a, b, weights):
+    """Linearly interpolate ``(..., 1, num_bones, k)`` arrays at each of ``weights``.
+
+    ``(num_bones, k)`` inputs give ``(len(weights), num_bones, k)``.
+    """
+    return a + weights[:, None, None] * (b - a)
+
+
+def _slerp(q0, q1, weights):
+    """Spherically interpolate unit quaternions at each of ``weights``; shapes as in ``_lerp``."""
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    # take the short way round
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.minimum(np.abs(dot), 1.0)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    w = weights[:, None, None]
+    # nearly identical rotations fall back to a normalised lerp
+    nearly_equal = sin_theta < 1e-6
+    safe_sin = np.where(nearly_equal, 1.0, sin_theta)
+    k0 = np.where(nearly_equal, 1.0 - w, np.sin((1.0 - w) * theta) / safe_sin)
+    k1 = np.where(nearly_equal, w, np.sin(w * theta) / safe_sin)
+    q = k0 * q0 + k1 * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def _blend_endpoints(ends, n_anims, src_idx, dst_idx, weights):
+    """Blend baked endpoint matrices into ``(len(src_idx), len(weights), num_bones, 4, 4)`` frames.
+
+    ``ends`` is ``(2 * n_anims, num_bones, 4, 4)``: every animation's first
+    frame, then every animation's last frame. Each transition runs from the
+    last frame of ``src_idx`` to the first frame of ``dst_idx``.
+    """
+    num_bones = ends.shape[1]
+    # SoA endpoint tensors, (2, n_anims, num_bones, k): [0] first frames, [1] last frames
+    loc, rot, scale = (a.reshape(2, n_anims, num_bones, -1)
+                       for a in _decompose_frame(ends.reshape(-1, 4, 4)))
+    out = np.empty((len(src_idx), len(weights), num_bones, 4, 4), dtype=np.float32)
+    _compose_frames(
+        _lerp(loc[1, src_idx, None], loc[0, dst_idx, None], weights),
+        _slerp(rot[1, src_idx, None], rot[0, dst_idx, None], weights),
+        _lerp(scale[1, src_idx, None], scale[0, dst_idx, None], weights),
+        out,
+    )
+    return out
+
+
+def _compose_frames(loc, rot, scale, out):
+    """Write ``T @ R @ S`` matrices for ``(frames, num_bones, k)`` TRS arrays into ``out``.
+
+    ``out`` is a ``(frames, num_bones, 4, 4)`` view into the destination slab and
+    is filled in the same transposed (column-major) layout as baked frames.
+    """
+    w, x, y, z = np.moveaxis(rot, -1, 0)
+    sx, sy, sz = np.moveaxis(scale, -1, 0)
+    # out[..., c, r] holds row r of column c
+    out[..., 0, 0] = (1.0 - 2.0 * (y * y + z * z)) * sx
+    out[..., 0, 1] = 2.0 * (x * y + w * z) * sx
+    out[..., 0, 2] = 2.0 * (x * z - w * y) * sx
+    out[..., 1, 0] = 2.0 * (x * y - w * z) * sy
+    out[..., 1, 1] = (1.0 - 2.0 * (x * x + z * z)) * sy
+    out[..., 1, 2] = 2.0 * (y * z + w * x) * sy
+    out[..., 2, 0] = 2.0 * (x * z + w * y) * sz
+    out[..., 2, 1] = 2.0 * (y * z - w * x) * sz
+    out[..., 2, 2] = (1.0 - 2.0 * (x * x + y * y)) * sz
+    out[..., :3, 3] = 0.0
+    out[..., 3, :3] = loc
+    out[..., 3, 3] = 1.0
+
+
+def _encode_frames(data, precision):
+    """Convert the flat float32 matrix buffer to the export ``precision``.
+
+    Returns the array to write and, for ``'INT16'``, the 16 float32 per-element
+    scales (``value = int16 * scale``); otherwise the scales are ``None``.
+    """
+    if precision == 'FP16':
+        return data.astype('<f2'), None
+    if precision == 'INT16':
+        slots = data.reshape(-1, 16)
+        scales = np.abs(slots).max(axis=0, initial=0.0) / np.float32(32767.0)
+        scales[scales == 0.0] = 1.0
+        return np.rint(slots / scales).astype('<i2').ravel(), scales
+    return data, None
+
+
+def _precision_js(precision, scales):
+    """JS object lines describing how the matrix buffer is encoded."""
+    text = f"  precision: '{precision}',\n"
+    if scales is not None:
+        text += f"  quantScales: [{', '.join(f'{s:.9g}' for s in scales.tolist())}],\n"
+    return text
+
+
+def _precision_suffix(precision):
+    """File name suffix for non-float32 exports, so an old Float32Array loader can't pick them up."""
+    return "" if precision == 'FP32' else f"_{precision.lower()}"
+
+
+def _store_precision(arm, property_name, precision, scales):
+    arm[f"{property_name}_precision"] = precision
+    if scales is not None:
+        arm[f"{property_name}_quantScales"] = scales.tolist()
+    elif f"{property_name}_quantScales" in arm:
+        del arm[f"{property_name}_quantScales"]
+
+
+def _write_bin(path, data):
+    """Write a contiguous matrix buffer (``_encode_frames`` output) to ``path`` without copying it."""
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(memoryview(data).cast('B'))
+
+
 def export_multiple_animations(context, unit_name, export_method='BIN',
-                               property_name="animation_matrices", export_all_frames=False):
+                               property_name="animation_matrices", export_all_frames=False,
+                               depsgraph=None, precision='FP32'):
     try:
         arm = context.active_object
         if not arm or arm.type != 'ARMATURE':
@@ -203,299 +755,257 @@ def export_multiple_animations(context, unit_name, export_method='BIN',
         scene = context.scene
         props = scene.animation_export_props          # <- keep this
         transition_frames = 10                        # fixed value
-        animations_to_export = [item for item in scene.animation_list if item.include and item.action]
+        # one pass over the RNA collection; everything below reads the specs
+        specs = [_AnimSpec(item, export_all_frames)
+                 for item in scene.animation_list if item.include and item.action]
 
-        if not animations_to_export:
+        if not specs:
             raise Exception("No animations selected for export")
 
         num_bones = len(arm.pose.bones)
+        scratch = _frame_scratch(num_bones)
+        if depsgraph is None:
+            depsgraph = context.evaluated_depsgraph_get()
         original_frame = scene.frame_current
         original_action = arm.animation_data.action if arm.animation_data else None
+        use_property = export_method == 'PROPERTY'
 
-        # ----------------------------------------------------------------
-        # Helper: collect matrices for current frame
-        # ----------------------------------------------------------------
-        def collect_matrices_at_frame(frame):
-            scene.frame_set(frame)
-            mats = []
-            for bone in arm.pose.bones:
-                mat = BLENDER_TO_THREE @ arm.matrix_world @ bone.matrix
-                for col in range(4):
-                    for row in range(4):
-                        mats.append(mat[row][col])
-            return np.array(mats, dtype=np.float32)
+        transitions = [(src, dst) for src in range(len(specs))
+                       for dst in range(len(specs)) if src != dst]
+        # rest pose and animations come first, transitions after them
+        n_main = 1 + len(specs)
+        n_sequences = n_main + len(transitions)
 
         # ----------------------------------------------------------------
         # 1. Rest pose (single frame)
         # ----------------------------------------------------------------
+        names = []
+        sequences = np.zeros(n_sequences, dtype=_SEQUENCE_DTYPE)
+
+        def add_sequence(name, frame_count, frame_step, range_start, range_end):
+            sequences[len(names)] = (0, 0, frame_count, frame_step, range_start, range_end)
+            names.append(name)
+
         rest_frame = 0 if scene.frame_start <= 0 else 1
-        all_matrix_data = [collect_matrices_at_frame(rest_frame)]
-        frame_counts = [1]
-        frame_steps = [1]
-        animation_ranges = [(rest_frame, rest_frame)]
-        total_frames = 1
-        animation_helpers = [{'name': f"{unit_name}Rest", 'start_idx': 0, 'end_idx': 0}]
+        add_sequence(f"{unit_name}Rest", 1, 1, rest_frame, rest_frame)
 
         # ----------------------------------------------------------------
-        # 2. Normal animations
+        # 2. Normal animations (frame lists only, baked in step 4)
         # ----------------------------------------------------------------
-        for item in animations_to_export:
-            action = item.action
-            if not arm.animation_data:
-                arm.animation_data_create()
-            arm.animation_data.action = action
+        for spec in specs:
+            add_sequence(spec.name, len(spec.frames), spec.frame_step, spec.start_frame, spec.end_frame)
 
-            if item.use_full_range:
-                start_frame = int(action.frame_range[0])
-                end_frame = int(action.frame_range[1])
-            else:
-                start_frame = item.custom_start
-                end_frame = item.custom_end if item.custom_end else int(action.frame_range[1])
+        # ----------------------------------------------------------------
+        # 3. Transitions (frame lists only, baked in step 4)
+        # ----------------------------------------------------------------
+        # bake frames – always include first & last, respect step
+        step = 1 if props.multi_export_all_frames else 1   # change here if you ever add a separate transition-step
+        tr_frames_to_export, tr_weights = _transition_weights(transition_frames, step)
 
-            if start_frame > end_frame:
-                raise Exception(f"Start frame cannot be after end frame for animation: {action.name}")
+        for src, dst in transitions:
+            tr_name = f"{specs[src].name}_To_{specs[dst].name}"
+            add_sequence(tr_name, len(tr_frames_to_export), step, 1, transition_frames)
 
-            if export_all_frames:
-                frames_to_export = list(range(start_frame, end_frame + 1))
-                frame_step = 1
-            else:
-                frame_step = item.frame_step
-                frames_to_export = list(range(start_frame, end_frame + 1, frame_step))
-                if frames_to_export[-1] != end_frame:
-                    frames_to_export.append(end_frame)
-
-            num_frames = len(frames_to_export)
-            frame_counts.append(num_frames)
-            frame_steps.append(frame_step)
-            animation_ranges.append((start_frame, end_frame))
-
-            start_idx = total_frames
-            end_idx = total_frames + num_frames - 1
-            animation_helpers.append({
-                'name': f"{action.name}",
-                'start_idx': start_idx,
-                'end_idx': end_idx
-            })
-            total_frames += num_frames
-
-            anim_matrices = np.zeros(num_frames * num_bones * 16, dtype=np.float32)
-            for f_idx, f_num in enumerate(frames_to_export):
-                scene.frame_set(f_num)
-                offset = f_idx * num_bones * 16
-                idx = offset
-                for bone in arm.pose.bones:
-                    mat = BLENDER_TO_THREE @ arm.matrix_world @ bone.matrix
-                    for col in range(4):
-                        for row in range(4):
-                            anim_matrices[idx] = mat[row][col]
-                            idx += 1
-            all_matrix_data.append(anim_matrices)
+        # sequences are packed back to back in the frame buffer
+        sequences['end_idx'] = np.cumsum(sequences['frame_count']) - 1
+        sequences['start_idx'] = sequences['end_idx'] - sequences['frame_count'] + 1
+        total_frames = int(sequences['end_idx'][-1]) + 1
+        starts = sequences['start_idx'].tolist()
+        ends = sequences['end_idx'].tolist()
 
         # ----------------------------------------------------------------
-        # 3. Real transition actions – exact steps you wrote
+        # 4. Bake every sequence into one preallocated buffer
         # ----------------------------------------------------------------
-        transitions = [(src, dst) for src in animations_to_export
-                       for dst in animations_to_export if src != dst]
-
-        def last_frame(item):
-            return int(item.action.frame_range[1]) if item.use_full_range else (item.custom_end or int(item.action.frame_range[1]))
-
-        def first_frame(item):
-            return int(item.action.frame_range[0]) if item.use_full_range else item.custom_start
+        combined_data = np.empty(total_frames * num_bones * 16, dtype=np.float32)
+        frames_view = combined_data.reshape(total_frames, num_bones, 4, 4)
 
-        original_action = arm.animation_data.action if arm.animation_data else None
+        wm = context.window_manager
+        # rest pose and animations are evaluated; transitions are blended afterwards
+        wm.progress_begin(0, ends[n_main - 1] + 1)
 
-        for src_item, dst_item in transitions:
-            src_last = last_frame(src_item)
-            dst_first = first_frame(dst_item)
-            tr_name = f"{src_item.action.name}_To_{dst_item.action.name}"
+        scene.frame_set(rest_frame)
+        _collect_frame(arm, depsgraph, scratch, frames_view[0])
 
-            # 1. create the transition action
-            tr_action = bpy.data.actions.new(name=tr_name)
-            if arm.animation_data is None:
+        for spec, start_idx in zip(specs, starts[1:n_main]):
+            action = spec.action
+            if not arm.animation_data:
                 arm.animation_data_create()
-
-            # ---------- frame 1 : last pose of SOURCE ----------
-            arm.animation_data.action = src_item.action
-            scene.frame_set(src_last)
-            bpy.context.view_layer.update()
-
-            bpy.ops.object.mode_set(mode='POSE')
-            bpy.ops.pose.select_all(action='SELECT')
-            bpy.ops.pose.copy()
-
-            arm.animation_data.action = tr_action
-            scene.frame_set(1)
-            bpy.ops.pose.paste(flipped=False)
-            for bone in arm.pose.bones:
-                bone.keyframe_insert(data_path="location", frame=1)
-                bone.keyframe_insert(data_path="rotation_quaternion", frame=1)
-                bone.keyframe_insert(data_path="scale", frame=1)
-
-            # ---------- frame 10 : first pose of TARGET ----------
-            arm.animation_data.action = dst_item.action
-            scene.frame_set(dst_first)
-            bpy.context.view_layer.update()
-
-            bpy.ops.pose.select_all(action='SELECT')
-            bpy.ops.pose.copy()
-
-            arm.animation_data.action = tr_action
-            scene.frame_set(10)
-            bpy.ops.pose.paste(flipped=False)
-            for bone in arm.pose.bones:
-                bone.keyframe_insert(data_path="location", frame=10)
-                bone.keyframe_insert(data_path="rotation_quaternion", frame=10)
-                bone.keyframe_insert(data_path="scale", frame=10)
-
-            # linear interpolation
-            for fcu in tr_action.fcurves:
-                for kp in fcu.keyframe_points:
-                    kp.interpolation = 'LINEAR'
-
-            # bake frames – always include first & last, respect step
-            step = 1 if props.multi_export_all_frames else 1   # change here if you ever add a separate transition-step
-            frames_to_export = list(range(1, transition_frames + 1, step))
-            if frames_to_export[-1] != transition_frames:
-                frames_to_export.append(transition_frames)
-            tr_matrices = np.zeros(len(frames_to_export) * num_bones * 16, dtype=np.float32)
-            arm.animation_data.action = tr_action
-            for f_idx, f_num in enumerate(frames_to_export):
+            arm.animation_data.action = action
+            # the rest pose was evaluated with the original action, so that
+            # action's rest frame is copied from row 0 instead of re-baked
+            rest_copy = rest_frame if action == original_action else None
+
+            for row, f_num in enumerate(spec.frames.tolist(), start_idx):
+                wm.progress_update(row)
+                if f_num == rest_copy:
+                    frames_view[row] = frames_view[0]
+                    continue
                 scene.frame_set(f_num)
-                off = f_idx * num_bones * 16
-                idx = off
-                for bone in arm.pose.bones:
-                    mat = BLENDER_TO_THREE @ arm.matrix_world @ bone.matrix
-                    for col in range(4):
-                        for row in range(4):
-                            tr_matrices[idx] = mat[row][col]
-                            idx += 1
-
-            # store
-            all_matrix_data.append(tr_matrices)
-            start_idx = total_frames
-            end_idx = total_frames + 9
-            animation_helpers.append({
-                'name': tr_name,
-                'start_idx': start_idx,
-                'end_idx': end_idx
-            })
-            total_frames += len(frames_to_export)
-            frame_counts.append(len(frames_to_export))
-            frame_steps.append(1 if props.multi_export_all_frames else 1)  # same as step above
-            animation_ranges.append((1, transition_frames))
+                _collect_frame(arm, depsgraph, scratch, frames_view[row])
+        wm.progress_end()
+
+        # Transitions blend from the source's last baked frame to the target's
+        # first one – both are already in the buffer, so no action is created
+        # and no frame is evaluated. Like the old keyed transitions, each bone
+        # is blended relative to its parent (location/scale lerped, rotation
+        # slerped) and the result is re-chained through the hierarchy, so
+        # children follow their parent's arc. A parent scaled to zero (a common
+        # way to hide bones) has no inverse; transitions touching such an
+        # endpoint blend that child in armature space and skip the link.
+        if transitions:
+            n_anims = n_main - 1
+            parents, order = _bone_hierarchy(arm.pose.bones)
+            # undo the world / Three.js transform: rows become armature-space
+            # poses (a zero-scale object leaves them in Three.js space)
+            scratch.world[:] = arm.matrix_world
+            np.matmul(scratch.world.T, _BLENDER_TO_THREE_T, out=scratch.pre_t)
+            to_three_t = scratch.pre_t
+            if abs(np.linalg.det(to_three_t.astype(np.float64))) < _SINGULAR_DET:
+                to_three_t = np.identity(4, dtype=np.float32)
+
+            end_rows = np.concatenate((sequences['start_idx'][1:n_main], sequences['end_idx'][1:n_main]))
+            end_pose_t = frames_view[end_rows] @ np.linalg.inv(to_three_t.astype(np.float64)).astype(np.float32)
+            # parent-relative transforms, transposed: local_t(b) = pose_t(b) @ pose_t(parent)^-1
+            end_local_t = end_pose_t.copy()
+            singular = np.zeros((len(end_rows), num_bones), dtype=bool)
+            for b, p in enumerate(parents):
+                if p >= 0:
+                    parent_t = end_pose_t[:, p].astype(np.float64)
+                    singular[:, b] = np.abs(np.linalg.det(parent_t)) < _SINGULAR_DET
+                    parent_t[singular[:, b]] = np.identity(4)
+                    end_local_t[:, b] = end_pose_t[:, b] @ np.linalg.inv(parent_t)
+
+            src_idx, dst_idx = np.array(transitions, dtype=np.intp).T
+            tr_pose_t = _blend_endpoints(end_local_t, n_anims, src_idx, dst_idx, tr_weights)
+            # (transitions, num_bones): links without a usable parent at either end
+            detached = singular[n_anims + src_idx] | singular[dst_idx]
+            if detached.any():
+                tr_pose_t = np.where(detached[:, None, :, None, None],
+                                     _blend_endpoints(end_pose_t, n_anims, src_idx, dst_idx, tr_weights),
+                                     tr_pose_t)
+            # re-chain parents first: pose_t(b) = local_t(b) @ pose_t(parent)
+            for b in order:
+                p = parents[b]
+                if p >= 0:
+                    chained = tr_pose_t[:, :, b] @ tr_pose_t[:, :, p]
+                    tr_pose_t[:, :, b] = np.where(detached[:, None, b, None, None], tr_pose_t[:, :, b], chained)
+
+            # transitions are packed back to back and all have the same length
+            tr_view = frames_view[starts[n_main]:]
+            np.matmul(tr_pose_t.reshape(-1, 4), to_three_t, out=tr_view.reshape(-1, 4))
 
         # restore original state
         if arm.animation_data and original_action:
             arm.animation_data.action = original_action
 
         # ----------------------------------------------------------------
-        # 4. Export
+        # 5. Export
         # ----------------------------------------------------------------
-        combined_data = np.concatenate(all_matrix_data)
+        frame_steps = sequences['frame_step']
+        encoded, quant_scales = _encode_frames(combined_data, precision)
 
-        if export_method == 'BIN':
+        if not use_property:
             blend_path = bpy.data.filepath
             if not blend_path:
                 raise Exception("Please save your blend file first to use binary export")
             export_dir = os.path.join(os.path.dirname(blend_path), "animation_export")
             os.makedirs(export_dir, exist_ok=True)
 
-            base_filename = f"{unit_name}_animations"
+            base_filename = f"{unit_name}_animations{_precision_suffix(precision)}"
             raw_path = os.path.join(export_dir, f"{base_filename}.bin")
-            with open(raw_path, 'wb') as f:
-                combined_data.tofile(f)
-
-            js_path = os.path.join(export_dir, f"{base_filename}.js")
-            with open(js_path, 'w') as f:
-                f.write(f"// Animation data for {unit_name}\n")
-                f.write("// Helper functions to set up animations:\n\n")
-                f.write("// ==============================================\n")
-                f.write(f"//   {unit_name.title()} animations\n")
-                f.write("// ==============================================\n\n")
-
-                # Separate rest / main animations from transitions
-                rest_and_main = [a for a in animation_helpers if "_To_" not in a['name']]
-                transitions    = [a for a in animation_helpers if "_To_" in a['name']]
-
-                f.write("//Main animations\n")
-                for anim in rest_and_main:
-                    f.write(f'material.setAnimationFrames("{unit_name}", "{anim["name"]}", {anim["start_idx"]}, {anim["end_idx"]}, 30);\n')
+            # the .bin write runs on a worker thread (file I/O releases the GIL)
+            # while the JS helper is assembled here
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                bin_written = executor.submit(_write_bin, raw_path, encoded)
+
+                js_path = os.path.join(export_dir, f"{base_filename}.js")
+                parts = []
+                parts.append(f"// Animation data for {unit_name}\n")
+                parts.append("// Helper functions to set up animations:\n\n")
+                parts.append("// ==============================================\n")
+                parts.append(f"//   {unit_name.title()} animations\n")
+                parts.append("// ==============================================\n\n")
+
+                parts.append("//Main animations\n")
+                parts.append("".join(
+                    f'material.setAnimationFrames("{unit_name}", "{name}", {start_idx}, {end_idx}, 30);\n'
+                    for name, start_idx, end_idx in zip(names[:n_main], starts[:n_main], ends[:n_main])))
 
                 if transitions:
-                    f.write("\n// Transition animations\n")
-                for anim in transitions:
-                    f.write(f'material.setAnimationFrames(\n')
-                    f.write(f'  "{unit_name}",\n')
-                    f.write(f'  "{anim["name"]}",\n')
-                    f.write(f'  {anim["start_idx"]},\n')
-                    f.write(f'  {anim["end_idx"]},\n')
-                    f.write(f'  30,\n')
-                    f.write(f'  true\n')
-                    f.write(f');\n')
-                f.write("\n")
+                    parts.append("\n// Transition animations\n")
+                for name, start_idx, end_idx in zip(names[n_main:], starts[n_main:], ends[n_main:]):
+                    parts.append(f'material.setAnimationFrames(\n'
+                                 f'  "{unit_name}",\n'
+                                 f'  "{name}",\n'
+                                 f'  {start_idx},\n'
+                                 f'  {end_idx},\n'
+                                 f'  30,\n'
+                                 f'  true\n'
+                                 f');\n')
+                parts.append("\n")
                 # ------------------------------------------------------------------
                 #  Build the setAnimationTransitions calls
                 # ------------------------------------------------------------------
-                main_anims = [a['name'] for a in rest_and_main
-                              if a['name'] != f"{unit_name}Rest"]   # ignore rest pose
+                main_anims = [name for name in names[:n_main]
+                              if name != f"{unit_name}Rest"]   # ignore rest pose
                 trans_map = {}        # src -> {dst: transition_name}
 
-                for tr in transitions:
-                    src_dst = tr['name'].replace(f"{unit_name}_", "").split("_To_")
-                    if len(src_dst) != 2:
-                        continue
-                    src, dst = src_dst
-                    trans_map.setdefault(src, {})[dst] = tr['name']
+                for (src, dst), tr_name in zip(transitions, names[n_main:]):
+                    trans_map.setdefault(names[1 + src], {})[names[1 + dst]] = tr_name
 
                 if trans_map:
-                    f.write("\n")
+                    parts.append("\n")
                 for src in main_anims:
                     if src not in trans_map:
                         continue
-                    f.write(f'material.setAnimationTransitions("{unit_name}", "{src}", {{\n')
+                    parts.append(f'material.setAnimationTransitions("{unit_name}", "{src}", {{\n')
                     pairs = [f'    {dst}: "{tr_name}"' for dst, tr_name in trans_map[src].items()]
-                    f.write(",\n".join(pairs))
-                    f.write("\n});\n")
-                f.write("\n")
-                f.write(f"const {unit_name}_animations = {{\n")
-                f.write(f"  numBones: {num_bones},\n")
-                f.write(f"  totalFrames: {total_frames},\n")
-                f.write(f"  animationCount: {len(animation_helpers)},\n")
-                f.write("  frameCounts: [")
-                f.write(", ".join(map(str, frame_counts)))
-                f.write("],\n")
-                f.write("  frameSteps: [")
-                f.write(", ".join(map(str, frame_steps)))
-                f.write("],\n")
-                f.write("  animationRanges: [\n")
-                for rng in animation_ranges:
-                    f.write(f"    [{rng[0]}, {rng[1]}],\n")
-                f.write("  ],\n")
-                f.write("  animationNames: [\n")
-                for item in animation_helpers:
-                    f.write(f"    '{item['name']}',\n")
-                f.write("  ],\n")
-                f.write("  boneNames: [\n")
-                for bone in arm.pose.bones:
-                    f.write(f"    '{bone.name}',\n")
-                f.write("  ],\n")
-                f.write("};\n")
-
-            msg = (f"Exported {len(animation_helpers)} sequences "
+                    parts.append(",\n".join(pairs))
+                    parts.append("\n});\n")
+                parts.append("\n")
+                parts.append(f"const {unit_name}_animations = {{\n")
+                parts.append(f"  numBones: {num_bones},\n")
+                parts.append(f"  totalFrames: {total_frames},\n")
+                parts.append(f"  animationCount: {n_sequences},\n")
+                parts.append(_precision_js(precision, quant_scales))
+                parts.append("  frameCounts: [")
+                parts.append(", ".join(map(str, sequences['frame_count'].tolist())))
+                parts.append("],\n")
+                parts.append("  frameSteps: [")
+                parts.append(", ".join(map(str, frame_steps.tolist())))
+                parts.append("],\n")
+                parts.append("  animationRanges: [\n")
+                animation_ranges = np.column_stack((sequences['range_start'], sequences['range_end']))
+                ranges_txt = io.StringIO()
+                np.savetxt(ranges_txt, animation_ranges, fmt="    [%d, %d],")
+                parts.append(ranges_txt.getvalue())
+                parts.append("  ],\n")
+                parts.append("  animationNames: [\n")
+                parts.append("".join(f"    '{name}',\n" for name in names))
+                parts.append("  ],\n")
+                parts.append("  boneNames: [\n")
+                parts.append("".join(f"    '{bone.name}',\n" for bone in arm.pose.bones))
+                parts.append("  ],\n")
+                parts.append("};\n")
+                with open(js_path, 'w') as f:
+                    f.write("".join(parts))
+                bin_written.result()   # re-raise any write error
+
+            msg = (f"Exported {n_sequences} sequences "
                    f"({total_frames} total frames) with {num_bones} bones to:\n{raw_path}\n"
                    f"JavaScript helper: {js_path}")
 
-        elif export_method == 'PROPERTY':
-            matrix_list = combined_data.tolist()
+        else:
             if property_name in arm:
                 del arm[property_name]
-            arm[property_name] = matrix_list
+            # raw little-endian bytes, same layout and precision as the .bin file
+            arm[property_name] = encoded.tobytes()
+            _store_precision(arm, property_name, precision, quant_scales)
             arm[f"{property_name}_totalFrames"] = total_frames
             arm[f"{property_name}_numBones"] = num_bones
-            arm[f"{property_name}_animationCount"] = len(animation_helpers)
-            arm[f"{property_name}_frameSteps"] = str(frame_steps)
-            msg = (f"Stored {len(animation_helpers)} sequences "
+            arm[f"{property_name}_animationCount"] = n_sequences
+            arm[f"{property_name}_frameSteps"] = str(frame_steps.tolist())
+            msg = (f"Stored {n_sequences} sequences "
                    f"({total_frames} total frames) with {num_bones} bones "
                    f"in armature custom property '{property_name}'")
 
@@ -504,9 +1014,6 @@ def export_multiple_animations(context, unit_name, export_method='BIN',
         if arm.animation_data and original_action:
             arm.animation_data.action = original_action
 
-        # switch back to Object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
-
         print(msg)
         bpy.ops.export_animation.show_message('INVOKE_DEFAULT', message=msg)
         return {'FINISHED'}
@@ -518,12 +1025,13 @@ def export_multiple_animations(context, unit_name, export_method='BIN',
         return {'CANCELLED'}
 
 # --------------------------------------------------------------------
-# Everything below is unchanged from previous version
+# Single-animation export
 # --------------------------------------------------------------------
 def export_animation_frames_raw(context, animation_name, use_custom_name, start_frame=None, end_frame=None,
                                 frame_step=1, export_all_frames=False, use_full_animation_range=False,
-                                export_method='BIN', property_name="animation_matrices"):
-    """Single-animation export – unchanged."""
+                                export_method='BIN', property_name="animation_matrices",
+                                depsgraph=None, precision='FP32'):
+    """Export the active armature's current animation as a .bin + JS helper or an armature property."""
     try:
         arm = context.active_object
         if not arm or arm.type != 'ARMATURE':
@@ -556,29 +1064,17 @@ def export_animation_frames_raw(context, animation_name, use_custom_name, start_
 
         current_frame = context.scene.frame_current
         num_bones = len(arm.pose.bones)
+        if depsgraph is None:
+            depsgraph = context.evaluated_depsgraph_get()
+        use_property = export_method == 'PROPERTY'
 
-        if export_all_frames:
-            frames_to_export = range(start_frame, end_frame + 1)
-        else:
-            frames_to_export = list(range(start_frame, end_frame + 1, frame_step))
-            if frames_to_export[-1] != end_frame:
-                frames_to_export.append(end_frame)
+        frames_to_export = _frame_numbers(start_frame, end_frame, 1 if export_all_frames else frame_step)
 
         num_frames = len(frames_to_export)
-        all_matrix_data = np.zeros(num_frames * num_bones * 16, dtype=np.float32)
-
-        for frame_idx, frame_number in enumerate(frames_to_export):
-            context.scene.frame_set(frame_number)
-            frame_offset = frame_idx * num_bones * 16
-            idx = frame_offset
-            for bone in arm.pose.bones:
-                mat = BLENDER_TO_THREE @ arm.matrix_world @ bone.matrix
-                for col in range(4):
-                    for row in range(4):
-                        all_matrix_data[idx] = mat[row][col]
-                        idx += 1
-
-        if export_method == 'BIN':
+        scratch = _frame_scratch(num_bones)
+        wm = context.window_manager
+
+        if not use_property:
             blend_path = bpy.data.filepath
             if not blend_path:
                 raise Exception("Please save your blend file first to use binary export")
@@ -588,43 +1084,96 @@ def export_animation_frames_raw(context, animation_name, use_custom_name, start_
             base_filename = f"{animation_name}_f{start_frame}_{end_frame}_n{num_frames}"
             if not export_all_frames:
                 base_filename += f"_s{frame_step}"
-
+            base_filename += _precision_suffix(precision)
             raw_path = os.path.join(export_dir, f"{base_filename}.bin")
-            with open(raw_path, 'wb') as f:
-                all_matrix_data.tofile(f)
 
+        # Float .bin exports are streamed one frame at a time, so memory stays
+        # constant. INT16 needs every frame for its scales and the property
+        # export needs a single bytes object, so those bake the whole buffer.
+        # With export_all_frames a simple rig is sampled straight from its
+        # F-Curves, in blocks of frames, without stepping the depsgraph.
+        baker = _FCurvePoseBaker.create(arm, context.scene) if export_all_frames else None
+        block_size = _FCURVE_BLOCK_FRAMES if baker is not None else 1
+
+        def bake_frames(frames, out):
+            if baker is not None:
+                baker.bake(frames, scratch, out)
+                return
+            for frame_number, frame_out in zip(frames.tolist(), out):
+                context.scene.frame_set(frame_number)
+                _collect_frame(arm, depsgraph, scratch, frame_out)
+
+        if not use_property and precision != 'INT16':
+            block_data = np.empty((block_size, num_bones, 4, 4), dtype=np.float32)
+            block_out = block_data if precision == 'FP32' else np.empty(block_data.shape, dtype='<f2')
+            wm.progress_begin(0, num_frames)
+            # stream into a temp file so a failed bake leaves the previous .bin intact
+            tmp_path = raw_path + ".tmp"
+            try:
+                with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                    for first in range(0, num_frames, block_size):
+                        wm.progress_update(first)
+                        block = frames_to_export[first:first + block_size]
+                        n = len(block)
+                        bake_frames(block, block_data[:n])
+                        if block_out is not block_data:
+                            block_out[:n] = block_data[:n]
+                        f.write(memoryview(block_out[:n]).cast('B'))
+                os.replace(tmp_path, raw_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            wm.progress_end()
+            quant_scales = None
+        else:
+            all_matrix_data = np.empty(num_frames * num_bones * 16, dtype=np.float32)
+            frames_view = all_matrix_data.reshape(num_frames, num_bones, 4, 4)
+
+            wm.progress_begin(0, num_frames)
+            for first in range(0, num_frames, block_size):
+                wm.progress_update(first)
+                bake_frames(frames_to_export[first:first + block_size],
+                            frames_view[first:first + block_size])
+            wm.progress_end()
+
+            encoded, quant_scales = _encode_frames(all_matrix_data, precision)
+            if not use_property:
+                _write_bin(raw_path, encoded)
+
+        if not use_property:
             js_path = os.path.join(export_dir, f"{base_filename}.js")
+            bone_names = "".join(f"    '{bone.name}',\n" for bone in arm.pose.bones)
             with open(js_path, 'w') as f:
-                f.write(f"// Animation data for {animation_name}\n")
-                f.write(f"const {animation_name}_animation = {{\n")
-                f.write(f"  numBones: {num_bones},\n")
-                f.write(f"  numFrames: {num_frames},\n")
-                f.write(f"  startFrame: {start_frame},\n")
-                f.write(f"  endFrame: {end_frame},\n")
-                f.write(f"  frameStep: {frame_step},\n")
-                f.write(f"  exportAllFrames: {str(export_all_frames).lower()},\n")
-                f.write("  boneNames: [\n")
-                for bone in arm.pose.bones:
-                    f.write(f"    '{bone.name}',\n")
-                f.write("  ],\n")
-                f.write("};\n\n")
-                f.write(f"// Helper function to set up animation:\n")
-                f.write(f"material.setAnimationFrames('{animation_name}', 0, {num_frames-1}, 30);\n")
+                f.write(f"// Animation data for {animation_name}\n"
+                        f"const {animation_name}_animation = {{\n"
+                        f"  numBones: {num_bones},\n"
+                        f"  numFrames: {num_frames},\n"
+                        f"  startFrame: {start_frame},\n"
+                        f"  endFrame: {end_frame},\n"
+                        f"  frameStep: {frame_step},\n"
+                        f"  exportAllFrames: {str(export_all_frames).lower()},\n"
+                        f"{_precision_js(precision, quant_scales)}"
+                        f"  boneNames: [\n"
+                        f"{bone_names}"
+                        f"  ],\n"
+                        f"}};\n\n"
+                        f"// Helper function to set up animation:\n"
+                        f"material.setAnimationFrames('{animation_name}', 0, {num_frames-1}, 30);\n")
 
             msg = f"Exported {num_frames} frames with {num_bones} bones to:\n{raw_path}\nJavaScript helper: {js_path}"
 
-        elif export_method == 'PROPERTY':
-            matrix_list = all_matrix_data.tolist()
+        else:
             if property_name in arm:
                 del arm[property_name]
-            arm[property_name] = matrix_list
+            # raw little-endian bytes, same layout and precision as the .bin file
+            arm[property_name] = encoded.tobytes()
+            _store_precision(arm, property_name, precision, quant_scales)
             arm[f"{property_name}_numFrames"] = num_frames
             arm[f"{property_name}_numBones"] = num_bones
             msg = f"Stored {num_frames} frames with {num_bones} bones in armature custom property '{property_name}'"
 
         context.scene.frame_set(current_frame)
-        # switch back to Object mode
-        bpy.ops.object.mode_set(mode='OBJECT')
 
         print(msg)
         bpy.ops.export_animation.show_message('INVOKE_DEFAULT', message=msg)
@@ -637,7 +1186,7 @@ def export_animation_frames_raw(context, animation_name, use_custom_name, start_
         return {'CANCELLED'}
 
 class ShowMessageOperator(bpy.types.Operator):
-    bl_idname = "export_animation.show_message"
+    bl_idname = _OP_SHOW_MESSAGE
     bl_label = "Export Result"
 
     message: bpy.props.StringProperty(default="")
@@ -665,17 +1214,22 @@ class ExportAnimationPanel(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
-        props = context.scene.animation_export_props
+        scene = context.scene
+        props = scene.animation_export_props
+        arm = context.object
+
+        if arm and arm.type == 'ARMATURE':
+            # read each RNA property once per redraw
+            mode = props.export_mode
+            method = props.export_method
 
-        if context.object and context.object.type == 'ARMATURE':
             box = layout.box()
             box.label(text="Export Mode", icon='EXPORT')
             box.prop(props, "export_mode", expand=True)
 
-            if props.export_mode == 'SINGLE':
+            if mode == 'SINGLE':
                 box = layout.box()
                 box.label(text="Animation Settings", icon='ANIM')
-                arm = context.object
                 action_name = ""
                 if arm.animation_data and arm.animation_data.action:
                     action_name = arm.animation_data.action.name
@@ -700,8 +1254,9 @@ class ExportAnimationPanel(bpy.types.Panel):
 
                 box.label(text="Export Method:", icon='EXPORT')
                 box.prop(props, "export_method", expand=True)
-                if props.export_method == 'PROPERTY':
+                if method == 'PROPERTY':
                     box.prop(props, "property_name")
+                box.prop(props, "export_precision")
             else:
                 box = layout.box()
                 box.label(text="Multi-Export Settings", icon='ANIM_DATA')
@@ -712,81 +1267,178 @@ class ExportAnimationPanel(bpy.types.Panel):
 
                 box.label(text="Available Animations:", icon='ACTION')
                 row = box.row()
-                row.operator("animation_list.refresh", icon='FILE_REFRESH')
+                row.operator(_OP_REFRESH_LIST, icon='FILE_REFRESH')
 
+                idx = scene.animation_list_index
+                n_items = len(scene.animation_list)
                 box.template_list(
-                    "AnimationList", "", context.scene, "animation_list",
-                    context.scene, "animation_list_index", rows=4
+                    "AnimationList", "", scene, "animation_list",
+                    scene, "animation_list_index", rows=4
                 )
-                if context.scene.animation_list_index >= 0 and len(context.scene.animation_list) > 0:
-                    box.operator("animation_list.edit_settings", icon='PREFERENCES')
+                if idx >= 0 and n_items > 0:
+                    box.operator(_OP_EDIT_SETTINGS, icon='PREFERENCES')
 
                 box.label(text="Export Method:", icon='EXPORT')
                 box.prop(props, "export_method", expand=True)
-                if props.export_method == 'PROPERTY':
+                if method == 'PROPERTY':
                     box.prop(props, "property_name")
+                box.prop(props, "export_precision")
 
-            layout.operator("export_animation.export", text="Export Animation", icon='EXPORT')
+            layout.operator(_OP_EXPORT, text="Export Animation", icon='EXPORT')
         else:
             layout.label(text="Select an armature to export", icon='ERROR')
 
+def _export_single(context, props, depsgraph):
+    return export_animation_frames_raw(
+        context=context,
+        animation_name=props.animation_name,
+        use_custom_name=props.use_custom_name,
+        start_frame=props.start_frame if props.start_frame != 0 and not props.use_full_animation_range else None,
+        end_frame=props.end_frame if props.end_frame != 0 and not props.use_full_animation_range else None,
+        frame_step=props.frame_step,
+        export_all_frames=props.export_all_frames,
+        use_full_animation_range=props.use_full_animation_range,
+        export_method=props.export_method,
+        property_name=props.property_name,
+        depsgraph=depsgraph,
+        precision=props.export_precision
+    )
+
+def _export_multi(context, props, depsgraph):
+    return export_multiple_animations(
+        context=context,
+        unit_name=props.unit_name,
+        export_method=props.export_method,
+        property_name=props.property_name,
+        export_all_frames=props.multi_export_all_frames,
+        depsgraph=depsgraph,
+        precision=props.export_precision
+    )
+
+# export_mode is resolved to an ordinal once, then dispatched through the table
+_EXPORT_MODE_INDEX = {'SINGLE': 0, 'MULTI': 1}
+_EXPORT_DISPATCH = {0: _export_single, 1: _export_multi}
+
 class ExportAnimationOperator(bpy.types.Operator):
-    bl_idname = "export_animation.export"
+    bl_idname = _OP_EXPORT
     bl_label = "Export Animation Frames"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        props = context.scene.animation_export_props
-        if props.export_mode == 'SINGLE':
-            return export_animation_frames_raw(
-                context=context,
-                animation_name=props.animation_name,
-                use_custom_name=props.use_custom_name,
-                start_frame=props.start_frame if props.start_frame != 0 and not props.use_full_animation_range else None,
-                end_frame=props.end_frame if props.end_frame != 0 and not props.use_full_animation_range else None,
-                frame_step=props.frame_step,
-                export_all_frames=props.export_all_frames,
-                use_full_animation_range=props.use_full_animation_range,
-                export_method=props.export_method,
-                property_name=props.property_name
-            )
-        else:
-            return export_multiple_animations(
-                context=context,
-                unit_name=props.unit_name,
-                export_method=props.export_method,
-                property_name=props.property_name,
-                export_all_frames=props.multi_export_all_frames
-            )
+        render = context.scene.render
+        lock_interface = render.use_lock_interface
+        # keep the UI from redrawing and frame-change handlers from running
+        # while frames are stepped
+        render.use_lock_interface = True
+        frame_handlers = (bpy.app.handlers.frame_change_pre, bpy.app.handlers.frame_change_post)
+        saved_handlers = [handlers[:] for handlers in frame_handlers]
+        for handlers in frame_handlers:
+            handlers.clear()
+        try:
+            props = context.scene.animation_export_props
+            export = _EXPORT_DISPATCH[_EXPORT_MODE_INDEX[props.export_mode]]
+            return export(context, props, context.evaluated_depsgraph_get())
+        finally:
+            context.window_manager.progress_end()
+            for handlers, saved in zip(frame_handlers, saved_handlers):
+                handlers[:] = saved
+            render.use_lock_interface = lock_interface
 
 # --------------------------------------------------------------------
 # Registration
 # --------------------------------------------------------------------
-def register():
-    bpy.utils.register_class(AnimationExportProperties)
-    bpy.utils.register_class(AnimationListItem)
-    bpy.utils.register_class(AnimationList)
-    bpy.utils.register_class(AnimationList_OT_Refresh)
-    bpy.utils.register_class(AnimationList_OT_EditSettings)
-    bpy.utils.register_class(ShowMessageOperator)
-    bpy.utils.register_class(ExportAnimationPanel)
-    bpy.utils.register_class(ExportAnimationOperator)
+_CORE_CLASSES = (
+    AnimationExportProperties,
+    AnimationListItem,
+)
+_UI_CLASSES = (
+    AnimationList,
+    AnimationList_OT_Refresh,
+    AnimationList_OT_EditSettings,
+    ShowMessageOperator,
+    ExportAnimationPanel,
+    ExportAnimationOperator,
+)
+# the factory's unregister function walks the classes in reverse
+_register_core_classes, _unregister_core_classes = bpy.utils.register_classes_factory(_CORE_CLASSES)
+_register_ui_classes, _unregister_ui_classes = bpy.utils.register_classes_factory(_UI_CLASSES)
+
+_ui_registered = False
+_msgbus_owner = object()
+
+def _invalidate_action_caches():
+    """msgbus callback: an action was renamed."""
+    # only the UI filter cache; the refresh operator re-hashes the actions itself
+    _filter_cache.clear()
+
+def _subscribe_msgbus():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    bpy.msgbus.subscribe_rna(key=(bpy.types.Action, "name"), owner=_msgbus_owner, args=(),
+                             notify=_invalidate_action_caches)
+
+@bpy.app.handlers.persistent
+def _resubscribe_msgbus(*_args):
+    # loading a file drops every msgbus subscription
+    _subscribe_msgbus()
+
+def _register_core():
+    _register_core_classes()
     bpy.types.Scene.animation_export_props = bpy.props.PointerProperty(type=AnimationExportProperties)
     bpy.types.Scene.animation_list = bpy.props.CollectionProperty(type=AnimationListItem)
     bpy.types.Scene.animation_list_index = bpy.props.IntProperty(name="Index for animation_list", default=0)
+    bpy.types.Scene.animation_list_signature = bpy.props.StringProperty(
+        name="Animation list signature",
+        default="",
+        options={'HIDDEN'},
+        description="Digest of the actions the animation list was last refreshed from",
+    )
 
-def unregister():
-    bpy.utils.unregister_class(AnimationExportProperties)
-    bpy.utils.unregister_class(AnimationListItem)
-    bpy.utils.unregister_class(AnimationList)
-    bpy.utils.unregister_class(AnimationList_OT_Refresh)
-    bpy.utils.unregister_class(AnimationList_OT_EditSettings)
-    bpy.utils.unregister_class(ShowMessageOperator)
-    bpy.utils.unregister_class(ExportAnimationPanel)
-    bpy.utils.unregister_class(ExportAnimationOperator)
+def _unregister_core():
     del bpy.types.Scene.animation_export_props
     del bpy.types.Scene.animation_list
     del bpy.types.Scene.animation_list_index
+    del bpy.types.Scene.animation_list_signature
+    _unregister_core_classes()
+
+def _register_ui():
+    global _ui_registered
+    if _ui_registered:
+        return
+    _register_ui_classes()
+    _subscribe_msgbus()
+    bpy.app.handlers.load_post.append(_resubscribe_msgbus)
+    _ui_registered = True
+
+def _unregister_ui():
+    global _ui_registered
+    if not _ui_registered:
+        return
+    if _resubscribe_msgbus in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_resubscribe_msgbus)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    _unregister_ui_classes()
+    _filter_cache.clear()
+    _ui_registered = False
+
+def _deferred_register_ui():
+    _register_ui()
+    return None   # one-shot timer
+
+def register():
+    _register_core()
+    if bpy.app.background:
+        # no event loop runs the timer in -b / --python sessions
+        _register_ui()
+        return
+    # panel and operators are registered once the main window is up; persistent
+    # so a .blend loaded from the command line does not drop the timer
+    bpy.app.timers.register(_deferred_register_ui, first_interval=0.0, persistent=True)
+
+def unregister():
+    if bpy.app.timers.is_registered(_deferred_register_ui):
+        bpy.app.timers.unregister(_deferred_register_ui)
+    _unregister_ui()
+    _unregister_core()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file